@@ -1,229 +1,460 @@
 import os
-import requests
+import asyncio
+import httpx
+import ijson
+import orjson
+import requests_cache
+import sqlite3
 import time
 import csv
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()]
 ORG_NAMES = [name.strip() for name in os.getenv("ORG_NAMES", "").split(",") if name.strip()]
 DAYS_INACTIVE_THRESHOLD = int(os.getenv('DAYS_INACTIVE_THRESHOLD', '60'))
+MAX_CONCURRENT_REPOS = int(os.getenv('MAX_CONCURRENT_REPOS', '10'))
+MAX_PAGES_PER_BRANCH = int(os.getenv('MAX_PAGES_PER_BRANCH', '50'))
+RATE_LIMIT_FLOOR = int(os.getenv('RATE_LIMIT_FLOOR', '100'))
 
 HEADERS = {
     "Authorization": f"Bearer {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github.v4+json"
+    "Accept": "application/vnd.github.v4+json",
+    "Content-Type": "application/json"
 }
 
-def run_query(query: str, variables: dict | None = None):
-    payload = {"query": query, "variables": variables}
-    resp = requests.post("https://api.github.com/graphql", json=payload, headers=HEADERS)
-    resp.raise_for_status()
-    data = resp.json()
-    if "errors" in data:
-        print("GraphQL Error Response:", data["errors"])
-        raise Exception("GraphQL query returned errors.")
-    return data
-
-def get_all_org_members_for_org(org: str) -> list[str]:
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+_Q_MEMBERS = """
+query($org: String!, $cursor: String) {
+  organization(login: $org) {
+    membersWithRole(first: 100, after: $cursor) {
+      nodes { login }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+_Q_COMMITS = """
+query($owner: String!, $name: String!, $branch: String!, $since: GitTimestamp!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    ref(qualifiedName: $branch) {
+      target { ... on Commit { history(first: 100, after: $cursor, since: $since) {
+        nodes { author { user { login } } committedDate }
+        pageInfo { hasNextPage endCursor }
+      }}}
+    }
+  }
+}
+"""
+
+_Q_SEARCH = """
+query($q: String!, $cursor: String) {
+  search(first: 100, after: $cursor, type: ISSUE, query: $q) {
+    nodes {
+      ... on Issue { author { login }, updatedAt }
+      ... on PullRequest { author { login }, updatedAt }
+    }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+# REST session with an on-disk ETag cache: repo and branch lists rarely change,
+# so repeat runs mostly get 304s that don't count against the primary rate limit.
+REST_API = "https://api.github.com"
+_rest_session = requests_cache.CachedSession(cache_name=".gh_cache", backend="sqlite", cache_control=True)
+_rest_session.headers.update({
+    "Authorization": f"Bearer {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json"
+})
+
+def _rest_get_paginated(url: str, params: dict | None = None) -> list[dict]:
+    items: list[dict] = []
+    while url:
+        resp = _rest_session.get(url, params=params)
+        resp.raise_for_status()
+        items.extend(resp.json())
+        url = resp.links.get("next", {}).get("url")
+        params = None
+    return items
+
+# Primary rate-limit budget, tracked from response headers so we only sleep
+# when actually close to exhaustion instead of on a fixed schedule.
+_rate_remaining: int | None = None
+_rate_reset: float = 0.0
+
+async def _wait_for_rate_budget():
+    global _rate_remaining
+    if _rate_remaining is not None and _rate_remaining < RATE_LIMIT_FLOOR:
+        wait = max(0.0, _rate_reset - time.time())
+        if wait:
+            print(f"⏳ Rate limit nearly exhausted, sleeping {wait:.0f}s until reset…")
+            await asyncio.sleep(wait)
+        _rate_remaining = None
+
+def _update_rate_budget(headers):
+    global _rate_remaining, _rate_reset
+    if "X-RateLimit-Remaining" in headers:
+        _rate_remaining = int(headers["X-RateLimit-Remaining"])
+        _rate_reset = float(headers.get("X-RateLimit-Reset", _rate_reset))
+
+async def _retry_after(headers, backoff: float) -> float:
+    wait = float(headers.get("Retry-After", backoff))
+    print(f"⏳ Secondary rate limit hit, retrying in {wait:.0f}s…")
+    await asyncio.sleep(wait)
+    return min(backoff * 2, 60.0)
+
+async def run_query(session: httpx.AsyncClient, query: str, variables: dict | None = None):
+    # Encode once up front (orjson) and POST raw bytes so the HTTP client
+    # doesn't re-serialize the same payload on retries.
+    payload = orjson.dumps({"query": query, "variables": variables})
+    backoff = 1.0
+    while True:
+        await _wait_for_rate_budget()
+        resp = await session.post(GRAPHQL_URL, content=payload)
+        _update_rate_budget(resp.headers)
+        if resp.status_code in (403, 429):
+            backoff = await _retry_after(resp.headers, backoff)
+            continue
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        if "errors" in data:
+            print("GraphQL Error Response:", data["errors"])
+            raise Exception("GraphQL query returned errors.")
+        return data
+
+class _AsyncReader:
+    # Minimal async file-like wrapper so ijson can pull response bytes straight
+    # off the wire instead of the body being buffered in full.
+    def __init__(self, resp: httpx.Response):
+        self._chunks = resp.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to sniff bytes vs str; returning a real
+        # chunk there would drop the start of the response body.
+        if size == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
+async def run_query_stream(session: httpx.AsyncClient, query: str, variables: dict, conn_path: str, on_node) -> dict:
+    # Stream-parse a single-connection response: on_node is called for each
+    # node under conn_path as it is decoded, and only the connection's pageInfo
+    # is returned, so peak memory stays flat however large the page is.
+    payload = orjson.dumps({"query": query, "variables": variables})
+    node_prefix = f"{conn_path}.nodes.item"
+    pageinfo_prefix = f"{conn_path}.pageInfo."
+    backoff = 1.0
+    while True:
+        await _wait_for_rate_budget()
+        async with session.stream("POST", GRAPHQL_URL, content=payload) as resp:
+            _update_rate_budget(resp.headers)
+            if resp.status_code in (403, 429):
+                backoff = await _retry_after(resp.headers, backoff)
+                continue
+            resp.raise_for_status()
+            page_info: dict = {}
+            builder = None
+            async for prefix, event, value in ijson.parse(_AsyncReader(resp)):
+                if builder is None and prefix == node_prefix and event == "start_map":
+                    builder = ijson.ObjectBuilder()
+                if builder is not None:
+                    builder.event(event, value)
+                    if prefix == node_prefix and event == "end_map":
+                        on_node(builder.value)
+                        builder = None
+                elif prefix.startswith(pageinfo_prefix):
+                    page_info[prefix[len(pageinfo_prefix):]] = value
+                elif prefix == "errors" and event == "start_array":
+                    raise Exception("GraphQL query returned errors.")
+            return page_info
+
+async def get_all_org_members_for_org(session: httpx.AsyncClient, org: str) -> list[str]:
     members: list[str] = []
     cursor, has_next = None, True
-    query = """
-    query($org: String!, $cursor: String) {
-      organization(login: $org) {
-        membersWithRole(first: 100, after: $cursor) {
-          nodes { login }
-          pageInfo { hasNextPage endCursor }
-        }
-      }
-    }
-    """
     while has_next:
         vars = {"org": org, "cursor": cursor}
-        data = run_query(query, vars)
-        nodes = data["data"]["organization"]["membersWithRole"]["nodes"]
-        members.extend(node["login"] for node in nodes)
-        page = data["data"]["organization"]["membersWithRole"]["pageInfo"]
-        cursor, has_next = page["endCursor"], page["hasNextPage"]
+        page = await run_query_stream(session, _Q_MEMBERS, vars,
+                                      "data.organization.membersWithRole",
+                                      lambda node: members.append(node["login"]))
+        cursor, has_next = page.get("endCursor"), page.get("hasNextPage", False)
     return members
 
-def get_repositories_for_org(org: str) -> list[str]:
-    repos, cursor, has_next = [], None, True
-    query = """
-    query($org: String!, $cursor: String) {
-      organization(login: $org) {
-        repositories(first: 100, after: $cursor) {
-          nodes { name }
-          pageInfo { hasNextPage endCursor }
-        }
-      }
-    }
-    """
-    while has_next:
-        data = run_query(query, {"org": org, "cursor": cursor})
-        repos.extend(repo["name"] for repo in data["data"]["organization"]["repositories"]["nodes"])
-        page = data["data"]["organization"]["repositories"]["pageInfo"]
-        cursor, has_next = page["endCursor"], page["hasNextPage"]
-    return repos
-
-def get_all_branches(repo: str, org: str) -> list[str]:
-    branches, cursor, has_next = [], None, True
-    query = """
-    query($org: String!, $repo: String!, $cursor: String) {
-      repository(owner: $org, name: $repo) {
-        refs(refPrefix: \"refs/heads/\", first: 100, after: $cursor) {
-          nodes { name }
-          pageInfo { hasNextPage endCursor }
-        }
-      }
-    }
-    """
-    while has_next:
-        vars = {"org": org, "repo": repo, "cursor": cursor}
-        data = run_query(query, vars)
-        branches.extend(ref["name"] for ref in data["data"]["repository"]["refs"]["nodes"])
-        page = data["data"]["repository"]["refs"]["pageInfo"]
-        cursor, has_next = page["endCursor"], page["hasNextPage"]
-    return branches
-
-def collect_branch_activity(org: str, repo: str, branch: str, since_iso: str) -> dict[str, str]:
-    activity: dict[str, str] = {}
-
-    q_commits = """
-    query($owner: String!, $name: String!, $branch: String!, $since: GitTimestamp!, $cursor: String) {
-      repository(owner: $owner, name: $name) {
-        ref(qualifiedName: $branch) {
-          target { ... on Commit { history(first: 100, after: $cursor, since: $since) {
-            nodes { author { user { login }, date } }
-            pageInfo { hasNextPage endCursor }
-          }}}
+async def get_repositories_for_org(org: str) -> list[tuple[str, str]]:
+    repos = await asyncio.to_thread(_rest_get_paginated, f"{REST_API}/orgs/{org}/repos", {"per_page": 100})
+    return [(repo["name"], repo["default_branch"]) for repo in repos]
+
+async def get_all_branches(repo: str, org: str) -> dict[str, str]:
+    branches = await asyncio.to_thread(_rest_get_paginated, f"{REST_API}/repos/{org}/{repo}/branches", {"per_page": 100})
+    return {branch["name"]: branch["commit"]["sha"] for branch in branches}
+
+BRANCHES_PER_REQUEST = 10
+
+def to_epoch(iso: str) -> int:
+    return int(datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp())
+
+def _record(activity: dict[str, int], login: str, date: str) -> bool:
+    # Timestamps are stored as int epoch seconds: parsed once here, compared as
+    # plain ints everywhere else, and only formatted back at CSV write time.
+    # Logins are casefolded because GitHub usernames are case-insensitive and
+    # commit/issue authors can surface with different casing.
+    login = login.casefold()
+    epoch = to_epoch(date)
+    cur = activity.get(login)
+    if cur is None or cur < epoch:
+        activity[login] = epoch
+        return True
+    return False
+
+def _merge_history_page(activity: dict[str, int], hist: dict) -> bool:
+    updated = False
+    for node in hist["nodes"]:
+        user = node["author"].get("user")
+        if user:
+            updated |= _record(activity, user["login"], node["committedDate"])
+    return updated
+
+@lru_cache(maxsize=None)
+def _build_repo_query(branch_count: int, include_search: bool) -> str:
+    var_defs = ["$owner: String!", "$name: String!", "$since: GitTimestamp!"]
+    search_field = ""
+    if include_search:
+        var_defs.append("$q: String!")
+        # One search connection covers both issues and PRs, filtered to the
+        # activity window server-side via `updated:>` in $q.
+        search_field = """
+      search(first: 100, type: ISSUE, query: $q) {
+        nodes {
+          ... on Issue { author { login }, updatedAt }
+          ... on PullRequest { author { login }, updatedAt }
         }
-      }
-    }
+        pageInfo { hasNextPage endCursor }
+      }"""
+    fields = []
+    for i in range(branch_count):
+        var_defs.append(f"$b{i}: String!")
+        fields.append(f"""
+        b{i}: ref(qualifiedName: $b{i}) {{
+          target {{ ... on Commit {{ history(first: 100, since: $since) {{
+            nodes {{ author {{ user {{ login }} }} committedDate }}
+            pageInfo {{ hasNextPage endCursor }}
+          }}}}}}
+        }}""")
+    return f"""
+    query({", ".join(var_defs)}) {{{search_field}
+      repository(owner: $owner, name: $name) {{{"".join(fields)}
+      }}
+    }}
     """
-    cursor, has_next = None, True
-    while has_next:
+
+async def _paginate_commits(session: httpx.AsyncClient, activity: dict[str, int], org: str, repo: str, branch: str, since_iso: str, cursor: str):
+    # History is newest-first, so once pages stop improving `activity` no later
+    # page can either; bail after two stale pages instead of walking the tail.
+    has_next, pages, pages_without_update = True, 1, 0
+    while has_next and pages < MAX_PAGES_PER_BRANCH:
         vars = {"owner": org, "name": repo, "branch": branch, "since": since_iso, "cursor": cursor}
-        data = run_query(q_commits, vars)
-        ref = data["data"]["repository"].get("ref")
-        if not ref or not ref.get("target"): break
-        hist = ref["target"]["history"]
-        for node in hist["nodes"]:
+        updated = False
+
+        def merge(node):
+            nonlocal updated
             user = node["author"].get("user")
             if user:
-                login, date = user["login"], node["author"]["date"]
-                if login not in activity or activity[login] < date:
-                    activity[login] = date
-        cursor, has_next = hist["pageInfo"]["endCursor"], hist["pageInfo"]["hasNextPage"]
-
-    q_issues = """
-    query($owner: String!, $name: String!, $cursor: String) {
-      repository(owner: $owner, name: $name) {
-        issues(first: 100, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
-          nodes { author { login }, updatedAt }
-          pageInfo { hasNextPage endCursor }
-        }
-      }
-    }
-    """
-    cursor, has_next = None, True
-    while has_next:
-        data = run_query(q_issues, {"owner": org, "name": repo, "cursor": cursor})
-        for issue in data["data"]["repository"]["issues"]["nodes"]:
-            if issue["author"]:
-                login, date = issue["author"]["login"], issue["updatedAt"]
-                if login not in activity or activity[login] < date:
-                    activity[login] = date
-        page = data["data"]["repository"]["issues"]["pageInfo"]
-        cursor, has_next = page["endCursor"], page["hasNextPage"]
-
-    q_prs = """
-    query($owner: String!, $name: String!, $cursor: String) {
-      repository(owner: $owner, name: $name) {
-        pullRequests(states: [OPEN, CLOSED, MERGED], orderBy: {field: UPDATED_AT, direction: DESC}, first: 100, after: $cursor) {
-          nodes { author { login }, updatedAt }
-          pageInfo { hasNextPage endCursor }
-        }
-      }
-    }
-    """
-    cursor, has_next = None, True
+                updated |= _record(activity, user["login"], node["committedDate"])
+
+        page = await run_query_stream(session, _Q_COMMITS, vars,
+                                      "data.repository.ref.target.history", merge)
+        if not page: break
+        if updated:
+            pages_without_update = 0
+        else:
+            pages_without_update += 1
+            if pages_without_update >= 2:
+                break
+        pages += 1
+        cursor, has_next = page.get("endCursor"), page.get("hasNextPage", False)
+
+def _search_query_for(org: str, repo: str, since_iso: str) -> str:
+    # `since_iso` is UTC; search qualifiers want YYYY-MM-DDTHH:MM:SSZ.
+    return f"repo:{org}/{repo} updated:>{since_iso[:19]}Z"
+
+async def _paginate_search(session: httpx.AsyncClient, activity: dict[str, int], search_q: str, cursor: str):
+    has_next = True
     while has_next:
-        data = run_query(q_prs, {"owner": org, "name": repo, "cursor": cursor})
-        for pr in data["data"]["repository"]["pullRequests"]["nodes"]:
-            if pr["author"]:
-                login, date = pr["author"]["login"], pr["updatedAt"]
-                if login not in activity or activity[login] < date:
-                    activity[login] = date
-        page = data["data"]["repository"]["pullRequests"]["pageInfo"]
-        cursor, has_next = page["endCursor"], page["hasNextPage"]
+        def merge(node):
+            if node.get("author"):
+                _record(activity, node["author"]["login"], node["updatedAt"])
+
+        page = await run_query_stream(session, _Q_SEARCH,
+                                      {"q": search_q, "cursor": cursor},
+                                      "data.search", merge)
+        cursor, has_next = page.get("endCursor"), page.get("hasNextPage", False)
+
+async def _scan_branch_chunk(session: httpx.AsyncClient, activity: dict[str, int], org: str, repo: str, default_branch: str, chunk: list[str], first_request: bool, since_iso: str):
+    query = _build_repo_query(len(chunk), include_search=first_request)
+    vars = {"owner": org, "name": repo, "since": since_iso}
+    if first_request:
+        vars["q"] = _search_query_for(org, repo, since_iso)
+    for i, branch in enumerate(chunk):
+        vars[f"b{i}"] = branch
+    data = (await run_query(session, query, vars))["data"]
+    repo_data = data["repository"]
+
+    # Each pagination chain is serial on its own cursor, but the chains are
+    # independent of each other; run them concurrently so one branch's deep
+    # history doesn't stall the rest.
+    followups = []
+
+    if first_request:
+        conn = data["search"]
+        for node in conn["nodes"]:
+            if node.get("author"):
+                _record(activity, node["author"]["login"], node["updatedAt"])
+        if conn["pageInfo"]["hasNextPage"]:
+            followups.append(_paginate_search(session, activity, vars["q"], conn["pageInfo"]["endCursor"]))
+
+    for i, branch in enumerate(chunk):
+        ref = repo_data.get(f"b{i}")
+        if not ref or not ref.get("target"): continue
+        hist = ref["target"]["history"]
+        _merge_history_page(activity, hist)
+        # Only the default branch is paginated further: other branches share
+        # most of its history, and their unique commits sit at the tip, so
+        # the first page is enough.
+        if branch == default_branch and hist["pageInfo"]["hasNextPage"]:
+            followups.append(_paginate_commits(session, activity, org, repo, branch, since_iso, hist["pageInfo"]["endCursor"]))
+
+    if followups:
+        await asyncio.gather(*followups)
+
+async def collect_repo_activity(session: httpx.AsyncClient, org: str, repo: str, default_branch: str, branches: list[str], since_iso: str) -> dict[str, int]:
+    activity: dict[str, int] = {}
+
+    all_refs = [default_branch] + branches
+    await asyncio.gather(*[
+        _scan_branch_chunk(session, activity, org, repo, default_branch,
+                           all_refs[offset:offset + BRANCHES_PER_REQUEST],
+                           offset == 0, since_iso)
+        for offset in range(0, len(all_refs), BRANCHES_PER_REQUEST)
+    ])
 
     return activity
 
-def main():
-    if not ORG_NAMES:
-        print("❗ Please set ORG_NAMES in your .env file")
+def _open_state_db(org: str) -> sqlite3.Connection:
+    db = sqlite3.connect(f".state_{org}.db")
+    db.execute("CREATE TABLE IF NOT EXISTS activity(user TEXT PRIMARY KEY, date INTEGER)")
+    return db
+
+def _flush_repo_activity(db: sqlite3.Connection, act: dict[str, int]):
+    # One transaction per repo; the table keeps only the newest date per user,
+    # so memory stays bounded and a crashed run can resume from the state file.
+    with db:
+        db.executemany(
+            "INSERT INTO activity(user, date) VALUES(?, ?) "
+            "ON CONFLICT(user) DO UPDATE SET date=excluded.date WHERE excluded.date > date",
+            act.items())
+
+async def process_repo(session: httpx.AsyncClient, org: str, repo: str, default_branch: str, since_iso: str, db: sqlite3.Connection):
+    try:
+        branch_oids = await get_all_branches(repo, org)
+        if not branch_oids:
+            print(f"  ⚠️  No branches in '{repo}', skipping.")
+            return
+        if default_branch not in branch_oids:
+            default_branch = next(iter(branch_oids))
+        # Branches whose tip equals the default branch tip have no history
+        # of their own; don't fetch them at all.
+        default_oid = branch_oids[default_branch]
+        branches = [name for name, oid in branch_oids.items()
+                    if name != default_branch and oid != default_oid]
+        print(f"📁 Repo: {repo} ({len(branches) + 1}/{len(branch_oids)} branches to scan)")
+        act = await collect_repo_activity(session, org, repo, default_branch, branches, since_iso)
+        _flush_repo_activity(db, act)
+    except Exception as e:
+        print(f"❌ Error on repo '{repo}': {e}")
+
+def _report_rows(db: sqlite3.Connection, since_epoch: int):
+    # time.gmtime/strftime are C-level and skip datetime object construction;
+    # writerows drains the generator without a Python call per row.
+    for user, epoch in db.execute("SELECT user, date FROM activity ORDER BY user"):
+        yield (user, time.strftime("%d-%m-%Y", time.gmtime(epoch)),
+               "true" if epoch >= since_epoch else "false")
+
+async def _run_org(org: str, token: str):
+    print(f"\n🔍 Fetching repos for organization: {org}")
+    try:
+        repos = await get_repositories_for_org(org)
+    except Exception as e:
+        print(f"❌ Skipping org {org} due to error: {e}")
         return
 
-    for ORG_NAME in ORG_NAMES:
-        print(f"\n🔍 Fetching repos for organization: {ORG_NAME}")
-        try:
-            repos = get_repositories_for_org(ORG_NAME)
-        except Exception as e:
-            print(f"❌ Skipping org {ORG_NAME} due to error: {e}")
-            continue
+    print(f"📦 Total repositories found in {org}: {len(repos)}")
+
+    since_date = datetime.now(timezone.utc) - timedelta(days=DAYS_INACTIVE_THRESHOLD)
+    since_iso = since_date.isoformat()
+    since_epoch = int(since_date.timestamp())
 
-        print(f"📦 Total repositories found in {ORG_NAME}: {len(repos)}")
-
-        since_date = datetime.now(timezone.utc) - timedelta(days=DAYS_INACTIVE_THRESHOLD)
-        since_iso = since_date.isoformat()
-
-        overall_activity: dict[str, str] = {}
-        repo_counter = 0
-
-        for repo in repos:
-            repo_counter += 1
-            print(f"\n📁 Repo [{repo_counter}/{len(repos)}]: {repo}")
-            try:
-                branches = get_all_branches(repo, ORG_NAME)
-                if not branches:
-                    print("  ⚠️  No branches, skipping.")
-                    continue
-                for br in branches:
-                    print(f"  🔍 Branch: {br}")
-                    try:
-                        act = collect_branch_activity(ORG_NAME, repo, br, since_iso)
-                        for user, date in act.items():
-                            if user not in overall_activity or overall_activity[user] < date:
-                                overall_activity[user] = date
-                    except Exception as e:
-                        print(f"  ⚠️  Skipping branch '{br}' due to error: {e}")
-            except Exception as e:
-                print(f"❌ Error on repo '{repo}': {e}")
-
-            if repo_counter % 100 == 0:
-                print("⏳ Sleeping 2 seconds to respect rate limits…")
-                time.sleep(2)
+    headers = dict(HEADERS, Authorization=f"Bearer {token}")
+    async with httpx.AsyncClient(http2=True, headers=headers, timeout=30) as session:
+        db = _open_state_db(org)
+
+        # Flat work queue drained by a fixed pool of workers: one global
+        # concurrency cap for the whole org instead of per-level nesting, and
+        # no idle task objects sitting behind a semaphore.
+        work = deque(repos)
+
+        async def worker():
+            while work:
+                repo, default_branch = work.popleft()
+                await process_repo(session, org, repo, default_branch, since_iso, db)
+
+        await asyncio.gather(*[worker() for _ in range(min(MAX_CONCURRENT_REPOS, len(repos)))])
 
         print("\n🔄 Fetching org members for never-active detection…")
-        all_members = set(get_all_org_members_for_org(ORG_NAME))
-        active_tracked = set(overall_activity.keys())
+        all_members = {m.casefold() for m in await get_all_org_members_for_org(session, org)}
+        active_tracked = frozenset(row[0] for row in db.execute("SELECT user FROM activity"))
         never_active_users = all_members - active_tracked
 
-        filename = f"user_activity_report_{ORG_NAME}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
-        print(f"📄 Writing CSV -> {filename}")
+    filename = f"user_activity_report_{org}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.csv"
+    print(f"📄 Writing CSV -> {filename}")
 
-        with open(filename, "w", newline="", encoding="utf-8") as fp:
-            w = csv.writer(fp)
-            w.writerow(["Users", "Last activity", "active"])
-            for user, last_iso in overall_activity.items():
-                dt = datetime.strptime(last_iso[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
-                w.writerow([user, dt.strftime("%d-%m-%Y"), str(dt >= since_date).lower()])
-            for user in sorted(never_active_users):
-                w.writerow([user, "N/A", "never-active"])
+    with open(filename, "w", newline="", encoding="utf-8") as fp:
+        w = csv.writer(fp)
+        w.writerow(["Users", "Last activity", "active"])
+        w.writerows(_report_rows(db, since_epoch))
+        w.writerows((user, "N/A", "never-active") for user in sorted(never_active_users))
 
-        print(f"✅ Done with {ORG_NAME}")
+    db.close()
+    os.remove(f".state_{org}.db")
+    print(f"✅ Done with {org}")
+
+def process_org(org: str, token: str):
+    # Runs in its own process: gets its own event loop, HTTP/2 session, and
+    # (with per-org tokens) its own rate-limit budget.
+    _rest_session.headers["Authorization"] = f"Bearer {token}"
+    asyncio.run(_run_org(org, token))
+
+def main():
+    if not ORG_NAMES:
+        print("❗ Please set ORG_NAMES in your .env file")
+        return
+
+    tokens = [GITHUB_TOKENS[i] if i < len(GITHUB_TOKENS) else GITHUB_TOKEN
+              for i in range(len(ORG_NAMES))]
+    if len(ORG_NAMES) == 1:
+        process_org(ORG_NAMES[0], tokens[0])
+        return
+    with ProcessPoolExecutor(max_workers=len(ORG_NAMES)) as ex:
+        list(ex.map(process_org, ORG_NAMES, tokens))
 
 if __name__ == "__main__":
     main()